@@ -24,7 +24,6 @@ import matplotlib
 matplotlib.use('Qt5Agg') # Use Qt5Agg for embedding in PyQt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
 from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
 
 # --- NIfTI/Volume Import ---
 try:
@@ -559,6 +558,20 @@ class CurvedMPRDialog(QDialog):
         self.canvas = FigureCanvasQTAgg(self.figure)
         self.ax = self.figure.add_subplot(111)
         layout.addWidget(self.canvas)
+
+        # Straightened CPR result, drawn into an embedded canvas
+        self.result_group = QGroupBox("Straightened CPR")
+        self.result_group.setCheckable(True)
+        self.result_group.setChecked(False)
+        result_layout = QVBoxLayout()
+        self.result_figure = Figure(figsize=(8, 4))
+        self.result_canvas = FigureCanvasQTAgg(self.result_figure)
+        self.result_ax = self.result_figure.add_subplot(111)
+        self.result_canvas.setVisible(False)
+        result_layout.addWidget(self.result_canvas)
+        self.result_group.setLayout(result_layout)
+        self.result_group.toggled.connect(self.result_canvas.setVisible)
+        layout.addWidget(self.result_group)
         
         self.status = QLabel("Ready")
         self.status.setStyleSheet("padding: 5px; color: #06ffa5;")
@@ -736,15 +749,17 @@ class CurvedMPRDialog(QDialog):
             # Transpose to get [Distance, Depth]
             straightened = np.array(straightened).T
             
-            # --- Display the result in a new window ---
-            result_fig = plt.figure(figsize=(12, 8))
-            plt.imshow(straightened, cmap='gray', aspect='auto', origin='lower')
-            plt.title(f"Straightened Curved MPR (Slices {start_z} to {end_z})", fontsize=16)
-            plt.xlabel("Distance along curve")
-            plt.ylabel(f"Depth (Slices {start_z}-{end_z})")
-            plt.colorbar(label='Intensity')
-            plt.tight_layout()
-            plt.show() # Shows the new plot
+            # --- Display the result in the dialog's result canvas ---
+            self.result_figure.clear()
+            self.result_ax = self.result_figure.add_subplot(111)
+            image = self.result_ax.imshow(straightened, cmap='gray', aspect='auto', origin='lower')
+            self.result_ax.set_title(f"Straightened Curved MPR (Slices {start_z} to {end_z})")
+            self.result_ax.set_xlabel("Distance along curve")
+            self.result_ax.set_ylabel(f"Depth (Slices {start_z}-{end_z})")
+            self.result_figure.colorbar(image, ax=self.result_ax, label='Intensity')
+            self.result_figure.tight_layout()
+            self.result_group.setChecked(True)
+            self.result_canvas.draw_idle()
             
             self.status.setText(f"CPR generated for slices {start_z}-{end_z}!")
             
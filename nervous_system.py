@@ -9,29 +9,190 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QTreeWidget, QTreeWidgetItem, QSplitter, QProgressBar,
                              QMessageBox, QListWidget, QDialog, QTextEdit,
                              QStyleFactory, QLineEdit)
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QThread, QUrl
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QThread, QUrl, QSignalBlocker
 # ---!!! الإصلاح هنا !!! ---
 from PyQt5.QtGui import QColor, QPalette, QIcon, QFont, QBrush
 import vtk
 from vtk.qt.QVTKRenderWindowInteractor import QVTKRenderWindowInteractor
 import os
-from collections import defaultdict
+import re
+import math
+from collections import defaultdict, Counter
+from functools import partial
 import time
+from contextlib import contextmanager
 
 # --- NEW: Imports from Dental/Musculoskeletal Code for MPR ---
 import matplotlib
 matplotlib.use('Qt5Agg')
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
 from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
 
 try:
     import nibabel as nib
     HAS_NIBABEL = True
 except:
     HAS_NIBABEL = False
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except:
+    HAS_NUMBA = False
 # --- END NEW IMPORTS ---
 
+# Folder loads larger than this keep their tree groups collapsed, so the
+# per-segment opacity slider widgets are only built when a group is opened.
+LAZY_TREE_THRESHOLD = 50
+
+
+def _match_segment_info(segment_name, group_regex, regex_group_name, group_rank):
+    """Highest-priority color group with a keyword in the name, or None"""
+    name_lower = segment_name.lower().replace('_', ' ')
+    # Single regex pass; keep the highest-priority group that matched
+    best = None
+    for m in group_regex.finditer(name_lower):
+        group_name = regex_group_name[m.lastgroup]
+        if best is None or group_rank[group_name] < group_rank[best]:
+            best = group_name
+    return best
+
+
+def _glow_influence_kernel(positions, cx, cy, cz, cr, nx, ny, nz, nr, blend, pulse, out):
+    """Fused per-segment glow influence: region falloff, blend, pulse and gamma"""
+    for i in range(positions.shape[0]):
+        dx = positions[i, 0] - cx
+        dy = positions[i, 1] - cy
+        dz = positions[i, 2] - cz
+        v = 1.0 - math.sqrt(dx * dx + dy * dy + dz * dz) / cr
+        if v < 0.0:
+            v = 0.0
+        if blend > 0.0:
+            dx = positions[i, 0] - nx
+            dy = positions[i, 1] - ny
+            dz = positions[i, 2] - nz
+            w = 1.0 - math.sqrt(dx * dx + dy * dy + dz * dz) / nr
+            if w < 0.0:
+                w = 0.0
+            v = (1.0 - blend) * v + blend * w
+        out[i] = (v * pulse) ** 1.5
+
+
+def _compute_clip_plane(px, py, pz, fx, fy, fz):
+    """Clip plane one unit ahead of the camera, facing along the view direction.
+    The last value is the view distance; 0 means there is no direction and
+    the returned normal is meaningless."""
+    dx, dy, dz = fx - px, fy - py, fz - pz
+    norm = math.sqrt(dx * dx + dy * dy + dz * dz)
+    if norm == 0.0:
+        return px, py, pz, 0.0, 0.0, 0.0, 0.0
+    inv = 1.0 / norm
+    nx, ny, nz = dx * inv, dy * inv, dz * inv
+    return px + nx, py + ny, pz + nz, nx, ny, nz, norm
+
+
+if HAS_NUMBA:
+    _glow_influence_kernel = njit(cache=True, fastmath=True)(_glow_influence_kernel)
+    _compute_clip_plane = njit(cache=True, fastmath=True)(_compute_clip_plane)
+
+
+# Application stylesheet (copied from dental code), filled from the
+# window's color scheme once with str.format
+APP_STYLESHEET = """
+    QMainWindow, QWidget {{
+        background-color: {bg_dark};
+        color: {text_light};
+        font-family: 'Segoe UI', Arial;
+        font-size: 11px;
+    }}
+    QPushButton {{
+        background-color: {accent_purple};
+        color: white;
+        border: none;
+        padding: 8px 15px;
+        border-radius: 6px;
+        font-weight: bold;
+    }}
+    QPushButton:hover {{
+        background-color: {accent_cyan};
+    }}
+    QPushButton:pressed {{
+        background-color: {accent_pink};
+    }}
+    QPushButton:checked {{
+        background-color: {accent_green};
+    }}
+    QGroupBox {{
+        border: 2px solid {accent_purple};
+        border-radius: 8px;
+        margin-top: 10px;
+        padding-top: 15px;
+        font-weight: bold;
+        color: {accent_cyan};
+    }}
+    QGroupBox::title {{
+        subcontrol-origin: margin;
+        left: 10px;
+        padding: 0 5px;
+    }}
+    QComboBox, QSpinBox, QDoubleSpinBox {{
+        background-color: {panel_bg};
+        color: {text_light};
+        border: 2px solid {accent_purple};
+        border-radius: 4px;
+        padding: 5px;
+    }}
+    QSlider::groove:horizontal {{
+        background: {panel_bg};
+        height: 8px;
+        border-radius: 4px;
+    }}
+    QSlider::handle:horizontal {{
+        background: {accent_purple};
+        width: 18px;
+        margin: -5px 0;
+        border-radius: 9px;
+    }}
+    QTreeWidget, QListWidget {{
+        background-color: {bg_medium};
+        color: {text_light};
+        border: 2px solid {accent_purple};
+        border-radius: 4px;
+    }}
+    QTreeWidget::item:selected, QListWidget::item:selected {{
+        background-color: {accent_purple};
+    }}
+    QCheckBox {{
+        color: {text_light};
+        spacing: 5px;
+    }}
+    QCheckBox::indicator {{
+        width: 18px;
+        height: 18px;
+        border-radius: 3px;
+        border: 2px solid {accent_purple};
+    }}
+    QCheckBox::indicator:checked {{
+        background-color: {accent_green};
+    }}
+    QProgressBar {{
+        border: 2px solid {accent_purple};
+        border-radius: 5px;
+        text-align: center;
+    }}
+    QProgressBar::chunk {{
+        background-color: {accent_green};
+    }}
+"""
+
+# Group opacity labels pick up their color through a property selector
+# appended to the one application stylesheet
+GROUP_LABEL_STYLE = """
+    QLabel[colorGroup="{name}"] {{
+        color: {color};
+        font-weight: bold;
+    }}
+"""
 
 # ==================== VTK CLASSES ====================
 # --- NEW: SegmentManager from Dental Code (Supports Opacity Widgets) ---
@@ -40,51 +201,257 @@ class SegmentManager:
     def __init__(self):
         self.segments = {}
         self.segment_groups = defaultdict(list)
+        # id(actor) -> segment name, for O(1) pick lookups
+        self._actor_id_to_name = {}
+        # Union of segment bounds; segments don't move, so only adds reset it
+        self._bounds = None
+        # Structure-of-arrays views (parallel lists indexed by load order)
+        # so bulk opacity/ambient passes walk cached vtkProperty handles
+        self._names = []
+        self._properties = []
+        self._segment_list = []
+        self._index = {}
+        self._group_member_indices = defaultdict(list)
+        # User opacity per slot, and the opacity last written to each
+        # vtkProperty, so bulk updates only touch properties that change
+        self._opacities = np.ones(0)
+        self._applied = np.ones(0)
+        # Per group: opacity percent -> number of segments at it
+        self._group_opacity_hist = defaultdict(Counter)
+        # Picker whose pick list mirrors the rendered actors (set by
+        # rebuild_picklist and kept in step as actors are shown or hidden)
+        self._picker = None
+        # (target slot, focus opacity, focus ambient, other opacity) while
+        # focus_properties is in effect; any other write clears it
+        self._focus_state = None
         
     def add_segment(self, name, actor, mapper, reader, system, color=(1, 1, 1)):
-        self.segments[name] = {
+        prop = actor.GetProperty()
+        segment = self.segments[name] = {
             'actor': actor,
+            'property': prop, # Cached vtkProperty handle
+            'default_ambient': prop.GetAmbient(),
             'mapper': mapper,
             'reader': reader,
             'opacity': 1.0,
             'color': color,
             'visible': True,
             'system': system,
-            'original_transform': vtk.vtkTransform(),
-            'current_transform': vtk.vtkTransform(),
+            'original_transform': None, # Created on first use
+            'current_transform': None,
             'original_color': color
         }
-        self.segment_groups[system].append(name)
-        actor.GetProperty().SetColor(*color)
+        i = self._index.get(name)
+        if i is None:
+            i = self._index[name] = len(self._names)
+            self._names.append(name)
+            self._properties.append(prop)
+            self._segment_list.append(segment)
+            self._opacities = np.append(self._opacities, 1.0)
+            self._applied = np.append(self._applied, prop.GetOpacity())
+        else:
+            # Reloading a name replaces its slot; move it if the group changed
+            old_system = self._segment_list[i]['system']
+            self._count_opacity(old_system, self._segment_list[i]['opacity'], -1)
+            self._properties[i] = prop
+            self._segment_list[i] = segment
+            self._opacities[i] = 1.0
+            self._applied[i] = prop.GetOpacity()
+            if old_system == system:
+                system = None
+            else:
+                self.segment_groups[old_system].remove(name)
+                self._group_member_indices[old_system].remove(i)
+        if system is not None:
+            self.segment_groups[system].append(name)
+            self._group_member_indices[system].append(i)
+        self._count_opacity(segment['system'], 1.0, 1)
+        self._actor_id_to_name[id(actor)] = name
+        self._bounds = None
+        self._focus_state = None
+        prop.SetColor(*color)
         
     def set_opacity(self, name, opacity):
         if name in self.segments:
-            self.segments[name]['opacity'] = opacity
-            self.segments[name]['actor'].GetProperty().SetOpacity(opacity)
+            self._set_opacity_at([self._index[name]], opacity)
+            
+    def _count_opacity(self, group_name, opacity, delta):
+        hist = self._group_opacity_hist[group_name]
+        key = int(round(opacity * 100))
+        hist[key] += delta
+        if hist[key] <= 0:
+            del hist[key]
+
+    def _set_opacity_at(self, indices, opacity):
+        idx = np.asarray(indices, dtype=np.intp)
+        segments = self._segment_list
+        for i in idx[self._opacities[idx] != opacity].tolist():
+            segment = segments[i]
+            self._count_opacity(segment['system'], segment['opacity'], -1)
+            self._count_opacity(segment['system'], opacity, 1)
+            segment['opacity'] = opacity
+        self._opacities[idx] = opacity
+        
+        # Only cross into VTK for properties not already at this opacity
+        changed = idx[self._applied[idx] != opacity]
+        if len(changed):
+            self._focus_state = None
+        for i in changed.tolist():
+            self._write_opacity(i, opacity)
+
+    def _write_opacity(self, i, opacity):
+        """Sets slot i's vtkProperty opacity. A fully transparent actor is
+        also hidden, so the renderer culls it instead of drawing nothing."""
+        shown_before = self._applied[i] > 0
+        self._applied[i] = opacity
+        self._properties[i].SetOpacity(opacity)
+        if shown_before != (opacity > 0):
+            segment = self._segment_list[i]
+            self._show_actor(segment, segment['visible'] and opacity > 0)
+
+    def _show_actor(self, segment, shown):
+        """Sets an actor's visibility and adds it to or drops it from the
+        pick list, so what is pickable always matches what is rendered"""
+        actor = segment['actor']
+        if bool(actor.GetVisibility()) == shown:
+            return
+        actor.SetVisibility(shown)
+        if self._picker is not None:
+            if shown:
+                self._picker.AddPickList(actor)
+            else:
+                self._picker.DeletePickList(actor)
+
+    def index_of(self, name):
+        """Slot of a segment in the structure-of-arrays views, or -1"""
+        return self._index.get(name, -1)
+
+    def apply_opacity_at(self, i, opacity):
+        """Writes a transient opacity (e.g. a glow) to slot i without
+        changing the segment's user opacity"""
+        self._focus_state = None
+        if self._applied[i] != opacity:
+            self._write_opacity(i, opacity)
+
+    def set_all_opacity(self, opacity):
+        """Sets the user opacity of every segment"""
+        self._set_opacity_at(range(len(self._properties)), opacity)
+
+    def set_group_opacity(self, group_name, opacity):
+        """Sets opacity on every segment assigned to a group at load time"""
+        self._set_opacity_at(self._group_member_indices.get(group_name, ()), opacity)
+
+    def group_opacity_uniform(self, group_name):
+        """True when every segment in the group is at the same opacity percent"""
+        return len(self._group_opacity_hist.get(group_name, ())) <= 1
+
+    def focus_properties(self, target_name, focus_opacity, focus_ambient, other_opacity):
+        """Highlights one segment and dims the rest. Switching targets with
+        the same settings only touches the old and new targets."""
+        target = self._index.get(target_name, -1)
+        state = (target, focus_opacity, focus_ambient, other_opacity)
+        previous = self._focus_state
+        self._focus_state = state
+        if previous is not None and previous[1:] == state[1:]:
+            slots = {previous[0], target}
+            slots.discard(-1)
+        else:
+            slots = range(len(self._properties))
+        properties = self._properties
+        for i in slots:
+            prop = properties[i]
+            if i == target:
+                self._write_opacity(i, focus_opacity)
+                prop.SetAmbient(focus_ambient)
+            else:
+                self._write_opacity(i, other_opacity)
+                prop.SetAmbient(self._segment_list[i]['default_ambient'])
+
+    def restore_properties(self):
+        """Resets every property to its user opacity and default ambient"""
+        self._focus_state = None
+        for i, segment in enumerate(self._segment_list):
+            self._write_opacity(i, segment['opacity'])
+            self._properties[i].SetAmbient(segment['default_ambient'])
             
     def set_color(self, name, color):
         if name in self.segments:
             self.segments[name]['color'] = color
-            self.segments[name]['actor'].GetProperty().SetColor(*color)
+            self.segments[name]['property'].SetColor(*color)
             
     def set_visibility(self, name, visible):
         if name in self.segments:
-            self.segments[name]['visible'] = visible
-            self.segments[name]['actor'].SetVisibility(visible)
+            segment = self.segments[name]
+            segment['visible'] = visible
+            self._show_actor(segment, visible and segment['property'].GetOpacity() > 0)
+
+    def set_group_visibility(self, group_name, visible):
+        """Shows or hides every segment assigned to a group at load time"""
+        for segment in self.get_segments_by_group(group_name):
+            segment['visible'] = visible
+            self._show_actor(segment, visible and segment['property'].GetOpacity() > 0)
             
     def get_segment(self, name):
         return self.segments.get(name)
+
+    def get_original_transform(self, name):
+        segment = self.segments[name]
+        if segment['original_transform'] is None:
+            segment['original_transform'] = vtk.vtkTransform()
+        return segment['original_transform']
+
+    def get_current_transform(self, name):
+        segment = self.segments[name]
+        if segment['current_transform'] is None:
+            segment['current_transform'] = vtk.vtkTransform()
+        return segment['current_transform']
     
     def get_segments_by_group(self, group_name):
         """Gets all segments belonging to a specific system/group"""
-        return [seg for seg in self.segments.values() if seg['system'] == group_name]
+        return [self.segments[name] for name in self.segment_groups.get(group_name, ())]
+
+    def get_name_for_actor(self, actor):
+        """Returns the segment name owning a (picked) actor, or None"""
+        return self._actor_id_to_name.get(id(actor))
 
     def get_all_actors(self):
         return [seg['actor'] for seg in self.segments.values()]
+
+    def get_bounds(self):
+        """Union of all segment bounds [xmin, xmax, ymin, ymax, zmin, zmax], or None"""
+        if self._bounds is None:
+            bbox = vtk.vtkBoundingBox()
+            for seg in self.segments.values():
+                bbox.AddBounds(seg['actor'].GetBounds())
+            if not bbox.IsValid():
+                return None
+            self._bounds = [0.0] * 6
+            bbox.GetBounds(self._bounds)
+        return list(self._bounds)
+
+    def rebuild_picklist(self, picker):
+        """Restricts the picker to the segment actors currently rendered.
+        The picker is kept, and later show/hide changes update its list."""
+        self._picker = picker
+        picker.InitializePickList()
+        for seg in self.segments.values():
+            if seg['actor'].GetVisibility():
+                picker.AddPickList(seg['actor'])
     
     def clear(self):
         self.segments.clear()
         self.segment_groups.clear()
+        self._actor_id_to_name.clear()
+        self._bounds = None
+        self._names = []
+        self._properties = []
+        self._segment_list = []
+        self._index.clear()
+        self._group_member_indices.clear()
+        self._opacities = np.ones(0)
+        self._applied = np.ones(0)
+        self._group_opacity_hist.clear()
+        self._focus_state = None
 
 # --- NEW: ClippingDialog from Dental Code ---
 class ClippingDialog(QDialog):
@@ -304,6 +671,20 @@ class CurvedMPRDialog(QDialog):
         self.canvas = FigureCanvasQTAgg(self.figure)
         self.ax = self.figure.add_subplot(111)
         layout.addWidget(self.canvas)
+
+        # Straightened CPR result, drawn into an embedded canvas
+        self.result_group = QGroupBox("Straightened CPR")
+        self.result_group.setCheckable(True)
+        self.result_group.setChecked(False)
+        result_layout = QVBoxLayout()
+        self.result_figure = Figure(figsize=(8, 4))
+        self.result_canvas = FigureCanvasQTAgg(self.result_figure)
+        self.result_ax = self.result_figure.add_subplot(111)
+        self.result_canvas.setVisible(False)
+        result_layout.addWidget(self.result_canvas)
+        self.result_group.setLayout(result_layout)
+        self.result_group.toggled.connect(self.result_canvas.setVisible)
+        layout.addWidget(self.result_group)
         
         self.status = QLabel("Ready")
         self.status.setStyleSheet("padding: 5px; color: #06ffa5;")
@@ -470,14 +851,17 @@ class CurvedMPRDialog(QDialog):
             
             straightened = np.array(straightened).T
             
-            result_fig = plt.figure(figsize=(12, 8))
-            plt.imshow(straightened, cmap='gray', aspect='auto', origin='lower')
-            plt.title(f"Straightened Curved MPR (Slices {start_z} to {end_z})", fontsize=16)
-            plt.xlabel("Distance along curve")
-            plt.ylabel(f"Depth (Slices {start_z}-{end_z})")
-            plt.colorbar(label='Intensity')
-            plt.tight_layout()
-            plt.show()
+            # --- Display the result in the dialog's result canvas ---
+            self.result_figure.clear()
+            self.result_ax = self.result_figure.add_subplot(111)
+            image = self.result_ax.imshow(straightened, cmap='gray', aspect='auto', origin='lower')
+            self.result_ax.set_title(f"Straightened Curved MPR (Slices {start_z} to {end_z})")
+            self.result_ax.set_xlabel("Distance along curve")
+            self.result_ax.set_ylabel(f"Depth (Slices {start_z}-{end_z})")
+            self.result_figure.colorbar(image, ax=self.result_ax, label='Intensity')
+            self.result_figure.tight_layout()
+            self.result_group.setChecked(True)
+            self.result_canvas.draw_idle()
             
             self.status.setText(f"CPR generated for slices {start_z}-{end_z}!")
             
@@ -498,7 +882,24 @@ class SurfaceNeuralSignalAnimator:
         self.signal_pathways = self.define_surface_pathways()
         self.original_colors = {}
         self.initial_properties = {}
-        
+
+        # Structure-of-arrays snapshot built in start_animation
+        self._names = []
+        self._segments = []
+        self._actors = []
+        self._props = []
+        # SegmentManager slot of each entry; opacity writes go through it
+        self._slots = []
+        self._orig_colors = np.zeros((0, 3))
+        self._init_diffuse = np.zeros(0)
+        self._init_specular = np.zeros(0)
+        self._init_specular_power = np.zeros(0)
+        self._init_ambient = np.zeros(0)
+        # Segment centers in brain-normalized coordinates, (N, 3)
+        self._norm_centers = np.zeros((0, 3))
+        # Indices of segments currently carrying glow properties
+        self._dirty = set()
+
     def define_surface_pathways(self):
         """Define neural pathways as sequences of regions that light up on the surface"""
         
@@ -544,6 +945,14 @@ class SurfaceNeuralSignalAnimator:
                 'transition_frames': 18
             }
         }
+
+        # Region schedules never change, so bake each one into a cumulative
+        # start-frame table: region i owns [cum[i], cum[i+1]), i.e. its
+        # duration followed by the transition into the next region.
+        for pw in pathways.values():
+            slots = [r['duration'] + pw['transition_frames'] for r in pw['regions']]
+            pw['_cum'] = np.cumsum([0] + slots)
+            pw['_total'] = int(pw['_cum'][-1])
         return pathways
         
     def start_animation(self, process_type):
@@ -554,17 +963,42 @@ class SurfaceNeuralSignalAnimator:
         self.stop_animation()
         
         for name, segment in self.segment_manager.segments.items():
-            prop = segment['actor'].GetProperty()
+            prop = segment['property']
             self.original_colors[name] = segment['original_color']
             # --- MODIFIED: Store ambient property ---
-            self.initial_properties[name] = {
-                'specular': prop.GetSpecular(),
-                'diffuse': prop.GetDiffuse(),
-                'specularPower': prop.GetSpecularPower(),
-                'opacity': segment['opacity'],
-                'ambient': prop.GetAmbient() # Store original ambient
-            }
-        
+            # (diffuse, specular, specularPower, ambient, opacity)
+            self.initial_properties[name] = (
+                prop.GetDiffuse(),
+                prop.GetSpecular(),
+                prop.GetSpecularPower(),
+                prop.GetAmbient(), # Store original ambient
+                segment['opacity'],
+            )
+
+        # Flatten the per-segment state into parallel arrays for the frame loop
+        self._names = list(self.original_colors.keys())
+        self._segments = [self.segment_manager.segments[n] for n in self._names]
+        self._actors = [seg['actor'] for seg in self._segments]
+        self._props = [seg['property'] for seg in self._segments]
+        self._slots = [self.segment_manager.index_of(n) for n in self._names]
+        self._orig_colors = np.array([self.original_colors[n] for n in self._names], dtype=float).reshape(-1, 3)
+        init_props = np.array([self.initial_properties[n] for n in self._names], dtype=float).reshape(-1, 5)
+        self._init_diffuse = init_props[:, 0]
+        self._init_specular = init_props[:, 1]
+        self._init_specular_power = init_props[:, 2]
+        self._init_ambient = init_props[:, 3]
+        self._dirty = set()
+
+        # Segments don't move while the glow runs, so normalize their
+        # centers against the brain bounds once instead of every frame
+        brain_bounds = np.asarray(self.get_brain_bounds(), dtype=float)
+        brain_center = (brain_bounds[0::2] + brain_bounds[1::2]) / 2
+        brain_scale = (brain_bounds[1::2] - brain_bounds[0::2]) / 2.0
+        brain_scale[brain_scale == 0] = 1.0
+        seg_bounds = np.array([actor.GetBounds() for actor in self._actors], dtype=float).reshape(-1, 6)
+        centers = (seg_bounds[:, 0::2] + seg_bounds[:, 1::2]) / 2
+        self._norm_centers = (centers - brain_center) / brain_scale
+
         self.active_process = process_type
         self.current_frame = 0
         self.is_animating = True
@@ -576,26 +1010,28 @@ class SurfaceNeuralSignalAnimator:
         for name, color in self.original_colors.items():
             if name in self.segment_manager.segments:
                 segment = self.segment_manager.segments[name]
-                prop = segment['actor'].GetProperty()
-                initial_props = self.initial_properties.get(name, {})
-                
-                prop.SetColor(*color)
-                
+                prop = segment['property']
+                diffuse, specular, specular_power, ambient, _ = self.initial_properties[name]
+
                 # --- MODIFIED: Restore all properties ---
-                if 'opacity' in initial_props:
-                    prop.SetOpacity(segment['opacity']) 
-                if 'specular' in initial_props:
-                    prop.SetSpecular(initial_props['specular'])
-                if 'diffuse' in initial_props:
-                    prop.SetDiffuse(initial_props['diffuse'])
-                if 'specularPower' in initial_props:
-                    prop.SetSpecularPower(initial_props['specularPower'])
-                if 'ambient' in initial_props:
-                    prop.SetAmbient(initial_props['ambient']) # Restore ambient
-                    
+                prop.SetColor(*color)
+                self.segment_manager.apply_opacity_at(
+                    self.segment_manager.index_of(name), segment['opacity'])
+                prop.SetSpecular(specular)
+                prop.SetDiffuse(diffuse)
+                prop.SetSpecularPower(specular_power)
+                prop.SetAmbient(ambient) # Restore ambient
+
         self.active_process = None
         self.original_colors.clear()
         self.initial_properties.clear()
+        self._names = []
+        self._segments = []
+        self._actors = []
+        self._props = []
+        self._slots = []
+        self._norm_centers = np.zeros((0, 3))
+        self._dirty.clear()
 
     def update_animation(self):
         """Update surface coloring based on current animation frame"""
@@ -607,133 +1043,93 @@ class SurfaceNeuralSignalAnimator:
         transition_frames = pathway['transition_frames']
         glow_color = pathway['color']
         
-        brain_bounds = self.get_brain_bounds()
-        if brain_bounds[0] > brain_bounds[1]:
-             return
-            
-        brain_center = np.array([(brain_bounds[0] + brain_bounds[1]) / 2,
-                                 (brain_bounds[2] + brain_bounds[3]) / 2,
-                                 (brain_bounds[4] + brain_bounds[5]) / 2])
-        brain_scale = np.array([brain_bounds[1] - brain_bounds[0],
-                                brain_bounds[3] - brain_bounds[2],
-                                brain_bounds[5] - brain_bounds[4]]) / 2.0
-        brain_scale[brain_scale == 0] = 1.0 
-
-        total_duration = sum(r['duration'] for r in regions) + (len(regions)) * transition_frames
-        
-        frame = self.current_frame % total_duration
-        
-        cumulative_time = 0
-        current_region_idx = 0
-        next_region_idx = 0
-        blend_factor = 0.0
-        
-        for idx, region in enumerate(regions):
-            region_start = cumulative_time
-            region_end = cumulative_time + region['duration']
-            transition_end = region_end + transition_frames
-            
-            if frame < region_end:
-                current_region_idx = idx
-                next_region_idx = idx
-                blend_factor = 0.0
-                break
-            elif idx < len(regions) - 1 and frame < transition_end:
-                current_region_idx = idx
-                next_region_idx = idx + 1
-                blend_factor = (frame - region_end) / transition_frames
-                break
-            
-            cumulative_time = transition_end
-            
+        frame = self.current_frame % pathway['_total']
+
+        # Locate the region slot containing this frame
+        idx = int(np.searchsorted(pathway['_cum'], frame, side='right')) - 1
+        offset = frame - pathway['_cum'][idx]
+        region_duration = regions[idx]['duration']
+
+        if offset < region_duration:
+            current_region_idx = idx
+            next_region_idx = idx
+            blend_factor = 0.0
+        elif idx < len(regions) - 1:
+            current_region_idx = idx
+            next_region_idx = idx + 1
+            blend_factor = (offset - region_duration) / transition_frames
+        else:
+            # Trailing gap after the last region wraps back to the first
+            current_region_idx = 0
+            next_region_idx = 0
+            blend_factor = 0.0
+
         pulse = 0.85 + 0.15 * np.sin(self.current_frame * 0.5 * self.signal_speed)
-        
-        for name, segment in self.segment_manager.segments.items():
-            actor = segment['actor']
-            original_color = self.original_colors.get(name, (0.9, 0.9, 0.9)) 
-            
-            bounds = actor.GetBounds()
-            center = np.array([(bounds[0] + bounds[1]) / 2, (bounds[2] + bounds[3]) / 2, (bounds[4] + bounds[5]) / 2])
-            normalized_pos = (center - brain_center) / brain_scale
-            
-            total_influence = 0.0
-            
-            current_region = regions[current_region_idx]
-            distance_current = np.linalg.norm(normalized_pos - np.array(current_region['center']))
-            influence_current = max(0, 1.0 - (distance_current / current_region['radius']))
-            
-            influence_next = 0.0
-            if blend_factor > 0 and next_region_idx != current_region_idx:
-                next_region = regions[next_region_idx]
-                distance_next = np.linalg.norm(normalized_pos - np.array(next_region['center']))
-                influence_next = max(0, 1.0 - (distance_next / next_region['radius']))
-
-            if next_region_idx == current_region_idx:
-                total_influence = influence_current
-            else:
-                total_influence = (1.0 - blend_factor) * influence_current + blend_factor * influence_next
-            
-            total_influence *= pulse
-            total_influence = total_influence ** 1.5 
 
-            if total_influence > 0.01:
-                
-                # --- MODIFIED: Stronger Glow ---
-                GLOW_INTENSITY_BOOST = 4.0 # Boost factor for glow
-                
-                new_color = tuple(
-                    oc * (1 - total_influence * 0.9) + gc * total_influence * GLOW_INTENSITY_BOOST
-                    for oc, gc in zip(original_color, glow_color)
-                )
-                
-                # Clamp at 1.5 to allow "hot" glow
-                new_color = tuple(max(0, min(1.5, c)) for c in new_color) 
-                
-                actor.GetProperty().SetColor(*new_color)
-                
-                prop = actor.GetProperty()
-                initial_props = self.initial_properties.get(name, {})
-                
-                prop.SetDiffuse(initial_props.get('diffuse', 0.8) * (1.0 - total_influence * 0.5))
-                # Boost ambient light
-                prop.SetAmbient(initial_props.get('ambient', 0.2) + total_influence * 0.8) 
-                # Stronger specular highlight
-                prop.SetSpecular(initial_props.get('specular', 0.4) + total_influence * 4.0) 
-                prop.SetSpecularPower(initial_props.get('specularPower', 40) + total_influence * 200) 
-                
-                current_user_opacity = segment['opacity']
-                prop.SetOpacity(min(1.0, current_user_opacity + total_influence * 0.2))
+        # Region geometry is constant for the whole frame
+        cur_c = np.asarray(regions[current_region_idx]['center'])
+        cur_r = regions[current_region_idx]['radius']
+        nxt_c = np.asarray(regions[next_region_idx]['center'])
+        nxt_r = regions[next_region_idx]['radius']
+        blending = blend_factor > 0 and next_region_idx != current_region_idx
 
-            else:
-                # Restore original properties
-                prop = actor.GetProperty()
-                prop.SetColor(*original_color)
-                
-                initial_props = self.initial_properties.get(name, {})
-                prop.SetDiffuse(initial_props.get('diffuse', 0.8))
-                prop.SetSpecular(initial_props.get('specular', 0.4))
-                prop.SetSpecularPower(initial_props.get('specularPower', 30))
-                prop.SetOpacity(segment['opacity'])
-                prop.SetAmbient(initial_props.get('ambient', 0.2)) # Restore ambient
+        # Influence of the active region(s) on every segment at once
+        positions = self._norm_centers
+        if HAS_NUMBA:
+            influence = np.empty(len(positions))
+            _glow_influence_kernel(positions, cur_c[0], cur_c[1], cur_c[2], cur_r,
+                                   nxt_c[0], nxt_c[1], nxt_c[2], nxt_r,
+                                   blend_factor if blending else 0.0, pulse, influence)
+        else:
+            influence = np.maximum(0.0, 1.0 - np.linalg.norm(positions - cur_c, axis=1) / cur_r)
+            if blending:
+                influence_next = np.maximum(0.0, 1.0 - np.linalg.norm(positions - nxt_c, axis=1) / nxt_r)
+                influence = (1.0 - blend_factor) * influence + blend_factor * influence_next
+            influence = (influence * pulse) ** 1.5
+
+        # --- MODIFIED: Stronger Glow ---
+        GLOW_INTENSITY_BOOST = 4.0 # Boost factor for glow
+        lit = influence > 0.01
+        t = influence[:, None]
+        # Clamp at 1.5 to allow "hot" glow
+        new_colors = np.clip(self._orig_colors * (1 - t * 0.9) + np.asarray(glow_color) * t * GLOW_INTENSITY_BOOST, 0, 1.5)
+        diffuse = self._init_diffuse * (1.0 - influence * 0.5)
+        # Boost ambient light
+        ambient = self._init_ambient + influence * 0.8
+        # Stronger specular highlight
+        specular = self._init_specular + influence * 4.0
+        specular_power = self._init_specular_power + influence * 200
+
+        apply_opacity_at = self.segment_manager.apply_opacity_at
+        for i in np.flatnonzero(lit).tolist():
+            prop = self._props[i]
+            prop.SetColor(*new_colors[i])
+            prop.SetDiffuse(diffuse[i])
+            prop.SetAmbient(ambient[i])
+            prop.SetSpecular(specular[i])
+            prop.SetSpecularPower(specular_power[i])
+            current_user_opacity = self._segments[i]['opacity']
+            apply_opacity_at(self._slots[i], min(1.0, current_user_opacity + influence[i] * 0.2))
+            self._dirty.add(i)
+
+        # Restore original properties (only segments lit last frame)
+        for i in [i for i in self._dirty if not lit[i]]:
+            self._dirty.discard(i)
+            prop = self._props[i]
+            prop.SetColor(*self._orig_colors[i])
+            prop.SetDiffuse(self._init_diffuse[i])
+            prop.SetSpecular(self._init_specular[i])
+            prop.SetSpecularPower(self._init_specular_power[i])
+            apply_opacity_at(self._slots[i], self._segments[i]['opacity'])
+            prop.SetAmbient(self._init_ambient[i]) # Restore ambient
 
         self.current_frame = int(self.current_frame + self.signal_speed)
     
     def get_brain_bounds(self):
         """Get bounding box of all brain segments"""
-        bounds = [1e10, -1e10, 1e10, -1e10, 1e10, -1e10]
-        
-        for segment in self.segment_manager.segments.values():
-            actor_bounds = segment['actor'].GetBounds()
-            bounds[0] = min(bounds[0], actor_bounds[0])
-            bounds[1] = max(bounds[1], actor_bounds[1])
-            bounds[2] = min(bounds[2], actor_bounds[2])
-            bounds[3] = max(bounds[3], actor_bounds[3])
-            bounds[4] = min(bounds[4], actor_bounds[4])
-            bounds[5] = max(bounds[5], actor_bounds[5])
-        
-        if bounds[0] > bounds[1]:
+        bounds = self.segment_manager.get_bounds()
+        if bounds is None:
             return [-10, 10, -10, 10, -10, 10]
-            
         return bounds
     
     def set_speed(self, speed):
@@ -743,50 +1139,31 @@ class SurfaceNeuralSignalAnimator:
 
 class FocusNavigator:
     """Handles focus navigation - From Cardiovascular code"""
-    def __init__(self, segment_manager):
+    def __init__(self, segment_manager, render_callback=None):
         self.segment_manager = segment_manager
-        self.original_properties = {}
+        self.render_callback = render_callback
         self.is_active = False
         
     def activate(self):
         """Called when Focus Mode is turned ON"""
         self.is_active = True
-        self.original_properties.clear()
-        for name, segment in self.segment_manager.segments.items():
-            prop = segment['actor'].GetProperty()
-            self.original_properties[name] = {
-                'opacity': prop.GetOpacity(),
-                'ambient': prop.GetAmbient(),
-            }
 
     def deactivate(self):
         """Called when Focus Mode is turned OFF"""
         self.is_active = False
-        for name, props in self.original_properties.items():
-            if name in self.segment_manager.segments:
-                # --- MODIFIED: Use segment manager's opacity property ---
-                segment = self.segment_manager.segments[name]
-                segment['actor'].GetProperty().SetOpacity(segment['opacity']) # Restore to user-set opacity
-                segment['actor'].GetProperty().SetAmbient(props['ambient'])
-        self.original_properties.clear()
-        if hasattr(self, 'vtk_widget'):
-            self.vtk_widget.GetRenderWindow().Render()
+        # --- MODIFIED: Restore to user-set opacity and default ambient ---
+        self.segment_manager.restore_properties()
+        if self.render_callback:
+            self.render_callback()
 
     def focus_on_segment(self, target_segment_name):
         """Called when a segment is CLICKED in focus mode"""
         if not self.is_active:
             return # Should be activated by button
         
-        for name, segment in self.segment_manager.segments.items():
-            prop = segment['actor'].GetProperty()
-            if name == target_segment_name:
-                prop.SetOpacity(1.0)
-                prop.SetAmbient(0.8)
-            else:
-                prop.SetOpacity(0.2)
-                prop.SetAmbient(self.original_properties.get(name, {}).get('ambient', 0.2))
-        if hasattr(self, 'vtk_widget'):
-            self.vtk_widget.GetRenderWindow().Render()
+        self.segment_manager.focus_properties(target_segment_name, 1.0, 0.8, 0.2)
+        if self.render_callback:
+            self.render_callback()
 
 
 class Brain3DVisualizationGUI(QMainWindow):
@@ -824,16 +1201,53 @@ class Brain3DVisualizationGUI(QMainWindow):
             'Other': {'color': (0.7, 0.7, 0.7), 'keywords': []}
         }
         self.default_group = 'Other'
+        
+        # Compile every keyword into one pattern with a named group per color
+        # group. The lookahead lets matches overlap so every keyword present is
+        # seen, and the earliest-defined group still wins as before.
+        self._regex_group_name = {}
+        alternatives = []
+        for group_name, info in self.color_groups.items():
+            if not info['keywords']:
+                continue
+            key = f"g{len(self._regex_group_name)}_" + re.sub(r'\W', '_', group_name)
+            self._regex_group_name[key] = group_name
+            alternatives.append(f"(?P<{key}>{'|'.join(map(re.escape, info['keywords']))})")
+        self._group_regex = re.compile('(?=' + '|'.join(alternatives) + ')')
+        self._group_rank = {g: i for i, g in enumerate(self.color_groups)}
+        # Exact keyword -> (group, color); the earliest-defined group wins
+        self._keyword_index = {}
+        for group_name, info in self.color_groups.items():
+            for kw in info['keywords']:
+                self._keyword_index.setdefault(kw, (group_name, info['color']))
         # This will store the actual QSlider widgets for the groups
         self.group_opacity_sliders = {}
+        # Group name -> top-level QTreeWidgetItem in the segment tree
+        self._group_tree_items = {}
+        # Segment name -> its row in the segment tree
+        self._segment_tree_items = {}
+        # Segment name -> its opacity QSlider in the tree (once attached)
+        self._segment_sliders = {}
+        # New tree groups open (and build their sliders) immediately unless
+        # a large folder load turns this off
+        self._expand_new_groups = True
         # --- END NEW ---
         
         self.apply_stylesheet()
         self.setup_vtk_early()
         
+        # Coalesced rendering: any number of request_render() calls made
+        # within one display frame (~16 ms) collapse into a single Render()
+        self._render_pending = False
+        self._render_batch_depth = 0
+        self._render_timer = QTimer()
+        self._render_timer.setSingleShot(True)
+        self._render_timer.setInterval(16)
+        self._render_timer.timeout.connect(self._do_render)
+        
         # --- MODIFIED: Use new SegmentManager ---
         self.segment_manager = SegmentManager()
-        self.focus_navigator = FocusNavigator(self.segment_manager)
+        self.focus_navigator = FocusNavigator(self.segment_manager, self.request_render)
         self.neural_animator = SurfaceNeuralSignalAnimator(self.renderer, self.segment_manager) 
         
         self.animation_timer = QTimer()
@@ -844,15 +1258,17 @@ class Brain3DVisualizationGUI(QMainWindow):
         # Flying camera
         self.flight_timer = QTimer()
         self.flight_timer.timeout.connect(self.update_flight_animation)
-        self.flight_interpolator = vtk.vtkCameraInterpolator()
-        self.flight_clip_plane = vtk.vtkPlane()
-        self.flight_plane_collection = vtk.vtkPlaneCollection()
-        self.flight_plane_collection.AddItem(self.flight_clip_plane)
-        self.empty_clip_planes = vtk.vtkPlaneCollection()
+        # Built by _ensure_flight on the first deep dive
+        self.flight_interpolator = None
+        self.flight_clip_plane = None
+        self.flight_plane_collection = None
+        self.empty_clip_planes = None
         self.flight_step = 0
         self.flight_duration = 30
         self.is_flight_mode = False
         self.is_diving = False
+        # True while a mouse button is held in the 3D view
+        self._mouse_interacting = False
         
         self.animation_frame = 0
         self.picker = None
@@ -864,6 +1280,9 @@ class Brain3DVisualizationGUI(QMainWindow):
         self.clipping_dialog = None
         self.mpr_dialog = None
         self.plane_actors = [] # For clipping planes
+        # Advanced clipping planes, built on first apply
+        self._clip_planes = None
+        self._clip_plane_collection = None
         
         self.init_ui()
     
@@ -875,93 +1294,11 @@ class Brain3DVisualizationGUI(QMainWindow):
         self.renderer.SetBackground2(0.2, 0.1, 0.3)
         
     def apply_stylesheet(self):
-        # Stylesheet (copied from dental code)
-        self.setStyleSheet(f"""
-            QMainWindow, QWidget {{
-                background-color: {self.colors['bg_dark']};
-                color: {self.colors['text_light']};
-                font-family: 'Segoe UI', Arial;
-                font-size: 11px;
-            }}
-            QPushButton {{
-                background-color: {self.colors['accent_purple']};
-                color: white;
-                border: none;
-                padding: 8px 15px;
-                border-radius: 6px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                background-color: {self.colors['accent_cyan']};
-            }}
-            QPushButton:pressed {{
-                background-color: {self.colors['accent_pink']};
-            }}
-            QPushButton:checked {{
-                background-color: {self.colors['accent_green']};
-            }}
-            QGroupBox {{
-                border: 2px solid {self.colors['accent_purple']};
-                border-radius: 8px;
-                margin-top: 10px;
-                padding-top: 15px;
-                font-weight: bold;
-                color: {self.colors['accent_cyan']};
-            }}
-            QGroupBox::title {{
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 5px;
-            }}
-            QComboBox, QSpinBox, QDoubleSpinBox {{
-                background-color: {self.colors['panel_bg']};
-                color: {self.colors['text_light']};
-                border: 2px solid {self.colors['accent_purple']};
-                border-radius: 4px;
-                padding: 5px;
-            }}
-            QSlider::groove:horizontal {{
-                background: {self.colors['panel_bg']};
-                height: 8px;
-                border-radius: 4px;
-            }}
-            QSlider::handle:horizontal {{
-                background: {self.colors['accent_purple']};
-                width: 18px;
-                margin: -5px 0;
-                border-radius: 9px;
-            }}
-            QTreeWidget, QListWidget {{
-                background-color: {self.colors['bg_medium']};
-                color: {self.colors['text_light']};
-                border: 2px solid {self.colors['accent_purple']};
-                border-radius: 4px;
-            }}
-            QTreeWidget::item:selected, QListWidget::item:selected {{
-                background-color: {self.colors['accent_purple']};
-            }}
-            QCheckBox {{
-                color: {self.colors['text_light']};
-                spacing: 5px;
-            }}
-            QCheckBox::indicator {{
-                width: 18px;
-                height: 18px;
-                border-radius: 3px;
-                border: 2px solid {self.colors['accent_purple']};
-            }}
-            QCheckBox::indicator:checked {{
-                background-color: {self.colors['accent_green']};
-            }}
-            QProgressBar {{
-                border: 2px solid {self.colors['accent_purple']};
-                border-radius: 5px;
-                text-align: center;
-            }}
-            QProgressBar::chunk {{
-                background-color: {self.colors['accent_green']};
-            }}
-        """)
+        group_rules = []
+        for group_name, info in self.color_groups.items():
+            r, g, b = [int(c * 255) for c in info['color']]
+            group_rules.append(GROUP_LABEL_STYLE.format(name=group_name, color=f"#{r:02x}{g:02x}{b:02x}"))
+        self.setStyleSheet(APP_STYLESHEET.format(**self.colors) + "".join(group_rules))
         
     def init_ui(self):
         central_widget = QWidget()
@@ -984,12 +1321,14 @@ class Brain3DVisualizationGUI(QMainWindow):
         
         self.setup_vtk()
         self.neural_animator.renderer = self.renderer 
-        self.focus_navigator.vtk_widget = self.vtk_widget
         self.statusBar().showMessage("Ready - Load brain model")
         
     def setup_vtk(self):
-        self.vtk_widget.GetRenderWindow().AddRenderer(self.renderer)
-        self.interactor = self.vtk_widget.GetRenderWindow().GetInteractor()
+        # The window and camera objects never change, so keep one wrapper each
+        self._render_window = self.vtk_widget.GetRenderWindow()
+        self._render_window.AddRenderer(self.renderer)
+        self._camera = self.renderer.GetActiveCamera()
+        self.interactor = self._render_window.GetInteractor()
         
         light1 = vtk.vtkLight()
         light1.SetPosition(100, 100, 100)
@@ -1005,13 +1344,77 @@ class Brain3DVisualizationGUI(QMainWindow):
         self.picker = vtk.vtkCellPicker()
         self.picker.SetTolerance(0.005)
         self.picker.PickFromListOn()
-        self.picker.InitializePickList()
+        self.segment_manager.rebuild_picklist(self.picker)
         self.interactor.SetPicker(self.picker)
         
         self.interactor.AddObserver("LeftButtonPressEvent", self.on_left_click, 1.0)
         self.interactor.AddObserver("LeftButtonReleaseEvent", self.on_left_up, 1.0)
+        for event in ("LeftButtonPressEvent", "MiddleButtonPressEvent", "RightButtonPressEvent",
+                      "LeftButtonReleaseEvent", "MiddleButtonReleaseEvent", "RightButtonReleaseEvent"):
+            self.interactor.AddObserver(event, self.on_mouse_interaction, 2.0)
         
         self.interactor.Initialize()
+    
+    # ==================== Rendering ====================
+    def request_render(self):
+        """Schedule a render on the next event-loop pass (coalesced)"""
+        if self._render_pending:
+            return
+        self._render_pending = True
+        if self._render_batch_depth == 0:
+            self._render_timer.start()
+    
+    def _do_render(self):
+        # Nothing to see while hidden or minimized; showEvent flushes the
+        # pending render once the window comes back
+        if not self.isVisible() or self.isMinimized():
+            return
+        self._render_pending = False
+        self._render_window.Render()
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._render_pending and self._render_batch_depth == 0:
+            self._render_timer.start()
+    
+    def _debounced(self, slider, slot, interval=16):
+        """Connect a slider so drags call slot(value) at most once per interval (ms).
+        The final value is always committed when the handle is released."""
+        timer = QTimer(slider)
+        timer.setSingleShot(True)
+        timer.setInterval(interval)
+        timer.timeout.connect(lambda: slot(slider.value()))
+        
+        def schedule(_value):
+            if not timer.isActive():
+                timer.start()
+        
+        def commit():
+            timer.stop()
+            slot(slider.value())
+        
+        slider.valueChanged.connect(schedule)
+        slider.sliderReleased.connect(commit)
+    
+    @contextmanager
+    def batched_renders(self):
+        """Defer all render requests made inside the block to its end"""
+        self._render_batch_depth += 1
+        try:
+            yield
+        finally:
+            self._render_batch_depth -= 1
+            if self._render_batch_depth == 0 and self._render_pending:
+                self._render_timer.start()
+    
+    def _update_background(self):
+        """Drop the gradient background while animating or dragging, restore it when idle"""
+        busy = (self._mouse_interacting or self.animation_timer.isActive()
+                or self.neural_timer.isActive() or self.flight_timer.isActive())
+        if busy == bool(self.renderer.GetGradientBackground()):
+            self.renderer.SetGradientBackground(not busy)
+            if not busy:
+                self.request_render()
         
     def create_left_panel(self):
         panel = QWidget()
@@ -1040,6 +1443,10 @@ class Brain3DVisualizationGUI(QMainWindow):
         load_demo_brain_btn.setStyleSheet(f"background-color: {self.colors['accent_green']}; font-size: 13px; padding: 10px;")
         data_layout.addWidget(load_demo_brain_btn)
         
+        self.smooth_on_load_checkbox = QCheckBox("Smooth Meshes on Load")
+        self.smooth_on_load_checkbox.setChecked(True)
+        data_layout.addWidget(self.smooth_on_load_checkbox)
+        
         self.data_status_label = QLabel("No data loaded")
         self.data_status_label.setStyleSheet(f"color: {self.colors['accent_yellow']};")
         self.data_status_label.setWordWrap(True)
@@ -1090,7 +1497,7 @@ class Brain3DVisualizationGUI(QMainWindow):
         self.neural_speed_slider.setMinimum(10)
         self.neural_speed_slider.setMaximum(300)
         self.neural_speed_slider.setValue(100)
-        self.neural_speed_slider.valueChanged.connect(self.update_neural_speed)
+        self._debounced(self.neural_speed_slider, self.update_neural_speed)
         neural_layout.addWidget(self.neural_speed_slider)
         
         self.neural_speed_label = QLabel("Speed: 1.0x")
@@ -1115,6 +1522,7 @@ class Brain3DVisualizationGUI(QMainWindow):
         self.segment_tree.setColumnWidth(0, 150)
         self.segment_tree.itemChanged.connect(self.on_segment_tree_changed)
         self.segment_tree.itemClicked.connect(self.on_segment_clicked)
+        self.segment_tree.itemExpanded.connect(self.on_segment_group_expanded)
         segment_layout.addWidget(self.segment_tree)
         
         segment_group.setLayout(segment_layout)
@@ -1185,7 +1593,7 @@ class Brain3DVisualizationGUI(QMainWindow):
         self.master_opacity_slider.setMinimum(0)
         self.master_opacity_slider.setMaximum(100)
         self.master_opacity_slider.setValue(100)
-        self.master_opacity_slider.valueChanged.connect(self.update_master_opacity)
+        self._debounced(self.master_opacity_slider, self.update_master_opacity)
         master_layout.addWidget(self.master_opacity_slider)
         
         self.master_opacity_label = QLabel("100%")
@@ -1206,19 +1614,16 @@ class Brain3DVisualizationGUI(QMainWindow):
 
         # Create sliders in the order defined in the map
         for group_name, info in self.color_groups.items():
-            # Get color for styling the label
-            r, g, b = [int(c * 255) for c in info['color']]
-            hex_color = f"#{r:02x}{g:02x}{b:02x}"
-            
+            # Colored by the QLabel[colorGroup=...] rule in the app stylesheet
             label = QLabel(group_name)
-            label.setStyleSheet(f"color: {hex_color}; font-weight: bold;")
+            label.setProperty("colorGroup", group_name)
             layout.addWidget(label)
             
             slider = QSlider(Qt.Horizontal)
             slider.setRange(0, 100)
             slider.setValue(100)
-            # Use a lambda with a default argument to capture the group_name
-            slider.valueChanged.connect(lambda val, g=group_name: self.update_group_opacity(g, val))
+            # Bind the group name once; the slot receives only the value
+            self._debounced(slider, partial(self.update_group_opacity, group_name))
             layout.addWidget(slider)
             
             # Store the slider widget
@@ -1344,14 +1749,10 @@ class Brain3DVisualizationGUI(QMainWindow):
             target_normal = self.picker.GetPickNormal()
             
             clicked_actor = self.picker.GetActor()
-            segment_name = None
-            for name, segment in self.segment_manager.segments.items():
-                if segment['actor'] == clicked_actor:
-                    segment_name = name
-                    break
+            segment_name = self.segment_manager.get_name_for_actor(clicked_actor)
             
             if self.is_flight_mode:
-                self.start_deep_dive(target_point, target_normal)
+                self.start_deep_dive(target_point, target_normal, segment_name)
                 self.is_flight_mode = False
                 self.flight_btn.setChecked(False)
                 self.flight_btn.setText("✈️ Select Deep Dive Target")
@@ -1370,41 +1771,42 @@ class Brain3DVisualizationGUI(QMainWindow):
     def on_left_up(self, obj, event):
         self.interactor.GetInteractorStyle().OnLeftButtonUp()
     
+    def on_mouse_interaction(self, obj, event):
+        self._mouse_interacting = event.endswith("PressEvent")
+        self._update_background()
+    
     # --- NEW: on_segment_tree_changed from Dental ---
     def on_segment_tree_changed(self, item, column):
         """Handle visibility change for both groups and individual segments"""
         if column == 0:
-            self.segment_tree.blockSignals(True) 
-            
-            is_checked = item.checkState(0) == Qt.Checked
-            
-            if item.parent() is None: # Top-level group item
-                for i in range(item.childCount()):
-                    child_item = item.child(i)
-                    child_name = child_item.text(0)
-                    self.segment_manager.set_visibility(child_name, is_checked)
-                    child_item.setCheckState(0, Qt.Checked if is_checked else Qt.Unchecked)
-            else: # Leaf segment item
-                segment_name = item.text(0)
-                self.segment_manager.set_visibility(segment_name, is_checked)
+            with self.batched_renders(), self.bulk_tree_update():
+                is_checked = item.checkState(0) == Qt.Checked
+            
+                if item.parent() is None: # Top-level group item
+                    self.segment_manager.set_group_visibility(item.text(0), is_checked)
+                    for i in range(item.childCount()):
+                        item.child(i).setCheckState(0, Qt.Checked if is_checked else Qt.Unchecked)
+                else: # Leaf segment item
+                    segment_name = item.text(0)
+                    self.segment_manager.set_visibility(segment_name, is_checked)
                 
-                # Update parent state
-                parent = item.parent()
-                all_unchecked = True
-                some_checked = False
-                for i in range(parent.childCount()):
-                    if parent.child(i).checkState(0) == Qt.Checked:
-                        all_unchecked = False
-                        some_checked = True
-                        break
+                    # Update parent state
+                    parent = item.parent()
+                    all_unchecked = True
+                    some_checked = False
+                    for i in range(parent.childCount()):
+                        if parent.child(i).checkState(0) == Qt.Checked:
+                            all_unchecked = False
+                            some_checked = True
+                            break
                 
-                if all_unchecked:
-                    parent.setCheckState(0, Qt.Unchecked)
-                elif some_checked:
-                    parent.setCheckState(0, Qt.Checked) 
+                    if all_unchecked:
+                        parent.setCheckState(0, Qt.Unchecked)
+                    elif some_checked:
+                        parent.setCheckState(0, Qt.Checked) 
 
-            self.segment_tree.blockSignals(False)
-            self.vtk_widget.GetRenderWindow().Render()
+                self.segment_manager.rebuild_picklist(self.picker)
+                self.request_render()
             
     def on_segment_clicked(self, item, column):
         segment_name = item.text(0)
@@ -1428,25 +1830,16 @@ class Brain3DVisualizationGUI(QMainWindow):
                 
                 self.focus_navigator.focus_on_segment(segment_name)
                 self.start_focus_flight(center, normal)
-                self.vtk_widget.GetRenderWindow().Render()
+                self.request_render()
     
     # ==================== Model Center Calculation ====================
     def update_model_center(self):
-        actors = self.segment_manager.get_all_actors()
-        if not actors:
+        bounds = self.segment_manager.get_bounds()
+        if bounds is None:
             self.model_center = [0, 0, 0]
             return
-
-        bounds = vtk.vtkBoundingBox()
-        for actor in actors:
-            bounds.AddBounds(actor.GetBounds())
         
-        min_pt = [0,0,0]
-        max_pt = [0,0,0]
-        bounds.GetMinPoint(min_pt)
-        bounds.GetMaxPoint(max_pt)
-        
-        self.model_center = [(min_pt[i] + max_pt[i]) / 2.0 for i in range(3)]
+        self.model_center = [(bounds[2*i] + bounds[2*i + 1]) / 2.0 for i in range(3)]
         self.renderer.ResetCameraClippingRange()
     
     # ==================== Flying Camera Methods ====================
@@ -1463,43 +1856,61 @@ class Brain3DVisualizationGUI(QMainWindow):
             self.flight_btn.setText("✈️ Select Deep Dive Target")
             self.statusBar().showMessage("Flight mode deactivated")
     
-    def start_deep_dive(self, target_point, target_normal):
-        self.statusBar().showMessage(f"Deep dive at {target_point}...")
+    def _ensure_flight(self):
+        """Creates the deep-dive camera interpolator and clip planes on first use"""
+        if self.flight_interpolator is not None:
+            return
+        self.flight_interpolator = vtk.vtkCameraInterpolator()
+        self.flight_clip_plane = vtk.vtkPlane()
+        self.flight_plane_collection = vtk.vtkPlaneCollection()
+        self.flight_plane_collection.AddItem(self.flight_clip_plane)
+        self.empty_clip_planes = vtk.vtkPlaneCollection()
+        if HAS_NUMBA:
+            # Compile (or load from cache) now rather than on the first frame
+            _compute_clip_plane(0.0, 0.0, 0.0, 0.0, 0.0, 1.0)
+    
+    def start_deep_dive(self, target_point, target_normal, segment_name=None):
+        self._ensure_flight()
+        if segment_name:
+            self.statusBar().showMessage(f"Deep dive into {segment_name}...")
+        else:
+            self.statusBar().showMessage(f"Deep dive at {target_point}...")
         
-        camera = self.renderer.GetActiveCamera()
+        camera = self._camera
         
         self.flight_interpolator.Initialize()
         self.flight_interpolator.SetInterpolationTypeToSpline()
         
         self.flight_interpolator.AddCamera(0.0, camera)
         
-        v1 = [0,0,0]
-        vtk.vtkMath.Perpendiculars(target_normal, v1, [0,0,0], 0)
+        target_point = np.asarray(target_point, dtype=np.float64)
+        target_normal = np.asarray(target_normal, dtype=np.float64)
+        # Orthonormal basis around the normal: cross with whichever axis is
+        # far from parallel to it (Hughes-Moller)
+        axis = np.array([1.0, 0.0, 0.0]) if abs(target_normal[0]) < 0.9 else np.array([0.0, 1.0, 0.0])
+        v1 = np.cross(target_normal, axis)
+        v1 /= np.linalg.norm(v1)
         v2 = np.cross(target_normal, v1)
         
         num_keyframes = 10
         dive_depth = 60.0
         spiral_radius = 15.0
         
-        for i in range(1, num_keyframes + 1):
-            t = i / num_keyframes
-            
-            dive_point = [target_point[j] - target_normal[j] * (t * dive_depth) for j in range(3)]
-            
-            angle = t * np.pi * 4
-            spiral_offset_v1 = [v * spiral_radius * np.cos(angle) for v in v1]
-            spiral_offset_v2 = [v * spiral_radius * np.sin(angle) for v in v2]
-            
-            cam_pos = [dive_point[j] + spiral_offset_v1[j] + spiral_offset_v2[j] for j in range(3)]
-            
-            focal_point = [target_point[j] - target_normal[j] * (t * dive_depth + 20) for j in range(3)]
-            
+        # All keyframes at once: (N,) times broadcast against the 3-vectors
+        t = np.arange(1, num_keyframes + 1) / num_keyframes
+        angles = t * np.pi * 4
+        dive_points = target_point - np.outer(t * dive_depth, target_normal)
+        cam_positions = dive_points + spiral_radius * (np.outer(np.cos(angles), v1) + np.outer(np.sin(angles), v2))
+        focal_points = target_point - np.outer(t * dive_depth + 20, target_normal)
+        view_up = v2.tolist()
+        
+        for i in range(num_keyframes):
             dive_cam = vtk.vtkCamera()
-            dive_cam.SetPosition(cam_pos)
-            dive_cam.SetFocalPoint(focal_point)
-            dive_cam.SetViewUp(v2)
+            dive_cam.SetPosition(cam_positions[i].tolist())
+            dive_cam.SetFocalPoint(focal_points[i].tolist())
+            dive_cam.SetViewUp(view_up)
             
-            self.flight_interpolator.AddCamera(t, dive_cam)
+            self.flight_interpolator.AddCamera(t[i], dive_cam)
         
         self.is_diving = True
         for segment in self.segment_manager.segments.values():
@@ -1507,48 +1918,67 @@ class Brain3DVisualizationGUI(QMainWindow):
 
         self.flight_step = 0
         self.flight_duration = self.flight_speed_slider.value() * 3 
+
+        # Sample the spline once per frame up front; ticks just index the table
+        n = self.flight_duration + 1
+        self.flight_positions = np.empty((n, 3))
+        self.flight_focals = np.empty((n, 3))
+        self.flight_view_ups = np.empty((n, 3))
+        self.flight_clipping = np.empty((n, 2))
+        sample_cam = vtk.vtkCamera()
+        for k in range(n):
+            self.flight_interpolator.InterpolateCamera(k / self.flight_duration, sample_cam)
+            self.flight_positions[k] = sample_cam.GetPosition()
+            self.flight_focals[k] = sample_cam.GetFocalPoint()
+            self.flight_view_ups[k] = sample_cam.GetViewUp()
+            self.flight_clipping[k] = sample_cam.GetClippingRange()
+
         self.flight_timer.start(33)
+        self._update_background()
     
     def start_focus_flight(self, target_point, target_normal):
         # Simple camera dolly, no complex flight
-        camera = self.renderer.GetActiveCamera()
+        camera = self._camera
         camera.SetFocalPoint(target_point)
         camera.Dolly(1.1)
-        self.vtk_widget.GetRenderWindow().Render()
+        self.request_render()
     
     def update_flight_animation(self):
         self.flight_step += 1
         t = self.flight_step / self.flight_duration
         
-        camera = self.renderer.GetActiveCamera()
+        camera = self._camera
         
         if t >= 1.0:
             t = 1.0
             self.flight_timer.stop()
+            self._update_background()
             self.statusBar().showMessage("Flight complete!")
             
             if self.is_diving:
                 self.is_diving = False
                 for segment in self.segment_manager.segments.values():
                     segment['mapper'].SetClippingPlanes(self.empty_clip_planes)
-                self.vtk_widget.GetRenderWindow().Render()
+                self.request_render()
             return
         
-        self.flight_interpolator.InterpolateCamera(t, camera)
+        k = self.flight_step
+        camera.SetPosition(self.flight_positions[k])
+        camera.SetFocalPoint(self.flight_focals[k])
+        camera.SetViewUp(self.flight_view_ups[k])
+        camera.SetClippingRange(self.flight_clipping[k])
         
         if self.is_diving:
             cam_pos = camera.GetPosition()
             cam_focal = camera.GetFocalPoint()
             
-            cam_normal = [cam_focal[i] - cam_pos[i] for i in range(3)]
-            vtk.vtkMath.Normalize(cam_normal)
-            
-            clip_pos = [cam_pos[i] + cam_normal[i] * 1.0 for i in range(3)]
-            
-            self.flight_clip_plane.SetOrigin(clip_pos)
-            self.flight_clip_plane.SetNormal(cam_normal)
+            ox, oy, oz, nx, ny, nz, norm = _compute_clip_plane(*cam_pos, *cam_focal)
+            # Focal point on the camera: keep the previous plane
+            if norm > 0.0:
+                self.flight_clip_plane.SetOrigin(ox, oy, oz)
+                self.flight_clip_plane.SetNormal(nx, ny, nz)
         
-        self.vtk_widget.GetRenderWindow().Render()
+        self.request_render()
     
     def toggle_focus_navigation(self, checked):
         if checked:
@@ -1586,27 +2016,29 @@ class Brain3DVisualizationGUI(QMainWindow):
         self.neural_animator.start_animation(process_type)
         if not self.neural_timer.isActive():
             self.neural_timer.start(33)
+        self._update_background()
         
         pathway_info = self.neural_animator.signal_pathways[process_type]
         self.neural_info_label.setText(f"Active: {pathway_info['name']}\n{pathway_info['description']}") 
         self.statusBar().showMessage(f"✨ {pathway_info['name']} started")
         
-        self.vtk_widget.GetRenderWindow().Render()
+        self._render_window.Render()
         
     def stop_neural_animation(self):
         self.neural_timer.stop()
+        self._update_background()
         self.neural_animator.stop_animation()
         self.pain_btn.setChecked(False)
         self.vision_btn.setChecked(False)
         self.thinking_btn.setChecked(False)
         self.neural_info_label.setText("Ready")
-        self.vtk_widget.GetRenderWindow().Render()
+        self._render_window.Render()
         self.statusBar().showMessage("Neural animation stopped")
     
     def update_neural_signals(self):
         if self.neural_animator.is_animating:
             self.neural_animator.update_animation()
-            self.vtk_widget.GetRenderWindow().Render()
+            self.request_render()
     
     def update_neural_speed(self, value):
         speed = value / 100.0
@@ -1616,33 +2048,29 @@ class Brain3DVisualizationGUI(QMainWindow):
     # ==================== Data Loading (MODIFIED) ====================
     
     # --- NEW: `add_segment_to_tree` from Dental, adapted for Brain ---
+    @contextmanager
+    def bulk_tree_update(self):
+        """Suspend segment-tree repaints and signals for a batch of edits"""
+        tree = self.segment_tree
+        tree.setUpdatesEnabled(False)
+        try:
+            with QSignalBlocker(tree):
+                yield
+        finally:
+            tree.setUpdatesEnabled(True)
+    
     def add_segment_to_tree(self, segment_name, system):
         """Add segment under a hierarchical group and set up opacity slider."""
-        item = QTreeWidgetItem([segment_name, "100%"])
+        segment = self.segment_manager.get_segment(segment_name)
+        value = int(round(segment['opacity'] * 100)) if segment else 100
+        item = QTreeWidgetItem([segment_name, f"{value}%"])
         item.setCheckState(0, Qt.Checked)
-        
-        opacity_widget = QWidget()
-        opacity_layout = QHBoxLayout(opacity_widget)
-        opacity_layout.setContentsMargins(0, 0, 0, 0)
-        
-        opacity_slider = QSlider(Qt.Horizontal)
-        opacity_slider.setMinimum(0)
-        opacity_slider.setMaximum(100)
-        opacity_slider.setValue(100)
-        opacity_slider.valueChanged.connect(
-            lambda val, name=segment_name: self.update_segment_opacity(name, val)
-        )
-        opacity_layout.addWidget(opacity_slider)
+        self._segment_tree_items[segment_name] = item
         
         # --- MODIFIED: Use the 'system' var directly as the group name ---
         root_name = system 
 
-        root_item = None
-        for i in range(self.segment_tree.topLevelItemCount()):
-            temp_item = self.segment_tree.topLevelItem(i)
-            if temp_item.text(0) == root_name:
-                root_item = temp_item
-                break
+        root_item = self._group_tree_items.get(root_name)
         
         if root_item is None:
             root_item = QTreeWidgetItem([root_name, "Group"])
@@ -1656,10 +2084,41 @@ class Brain3DVisualizationGUI(QMainWindow):
             
             root_item.setCheckState(0, Qt.Checked)
             self.segment_tree.addTopLevelItem(root_item)
+            self._group_tree_items[root_name] = root_item
             
         root_item.addChild(item)
+        if self._expand_new_groups:
+            root_item.setExpanded(True)
+        # Collapsed groups get their slider widgets on first expansion
+        if root_item.isExpanded():
+            self.attach_opacity_slider(item)
+    
+    def attach_opacity_slider(self, item):
+        """Create the opacity slider widget for a segment row (once)."""
+        if self.segment_tree.itemWidget(item, 1) is not None:
+            return
+        segment_name = item.text(0)
+        segment = self.segment_manager.get_segment(segment_name)
+        value = int(round(segment['opacity'] * 100)) if segment else 100
+        
+        opacity_widget = QWidget()
+        opacity_layout = QHBoxLayout(opacity_widget)
+        opacity_layout.setContentsMargins(0, 0, 0, 0)
+        
+        opacity_slider = QSlider(Qt.Horizontal)
+        opacity_slider.setMinimum(0)
+        opacity_slider.setMaximum(100)
+        opacity_slider.setValue(value)
+        opacity_slider.valueChanged.connect(partial(self.update_segment_opacity, segment_name))
+        opacity_layout.addWidget(opacity_slider)
+        
         self.segment_tree.setItemWidget(item, 1, opacity_widget)
-        root_item.setExpanded(True)
+        self._segment_sliders[segment_name] = opacity_slider
+    
+    def on_segment_group_expanded(self, item):
+        if item.parent() is None:
+            for i in range(item.childCount()):
+                self.attach_opacity_slider(item.child(i))
             
     # --- NEW: `load_segment_file` from Dental ---
     def load_segment_file(self):
@@ -1674,7 +2133,6 @@ class Brain3DVisualizationGUI(QMainWindow):
             self.load_segment(file_path, segment_name)
             self.update_model_center()
             self.renderer.ResetCamera()
-            self.vtk_widget.GetRenderWindow().Render()
             
     # --- NEW: `load_segments_folder` from Dental ---
     def load_segments_folder(self):
@@ -1687,22 +2145,28 @@ class Brain3DVisualizationGUI(QMainWindow):
                 QMessageBox.warning(self, "No Files", "No 3D model files found in folder")
                 return
             
-            for i, filename in enumerate(files):
-                file_path = os.path.join(folder_path, filename)
-                segment_name = os.path.splitext(filename)[0]
-                
-                # --- MODIFIED: Color/System assigned in load_segment ---
-                self.load_segment(file_path, segment_name)
+            self._expand_new_groups = len(files) <= LAZY_TREE_THRESHOLD
+            try:
+                with self.batched_renders(), self.bulk_tree_update():
+                    for i, filename in enumerate(files):
+                        file_path = os.path.join(folder_path, filename)
+                        segment_name = os.path.splitext(filename)[0]
+                        
+                        # --- MODIFIED: Color/System assigned in load_segment ---
+                        self.load_segment(file_path, segment_name, defer_picker=True)
+            finally:
+                self._expand_new_groups = True
             
+            self.segment_manager.rebuild_picklist(self.picker)
             self.update_model_center()
             self.renderer.ResetCamera()
-            self.vtk_widget.GetRenderWindow().Render()
+            self.request_render()
             self.statusBar().showMessage(f"Loaded {len(files)} segments from folder")
             self.data_status_label.setText(f"✓ {len(files)} segments loaded")
             self.data_status_label.setStyleSheet(f"color: {self.colors['accent_green']};")
 
     # --- MODIFIED: `load_segment` (replaces `_load_single_segment_file`) ---
-    def load_segment(self, file_path, segment_name):
+    def load_segment(self, file_path, segment_name, defer_picker=False):
         ext = os.path.splitext(file_path)[1].lower()
         
         reader = None
@@ -1732,18 +2196,40 @@ class Brain3DVisualizationGUI(QMainWindow):
             print(f"Warning: Could not read or file is empty: {file_path}")
             return
 
-        smoother = vtk.vtkSmoothPolyDataFilter()
-        smoother.SetInputData(polydata)
-        smoother.SetNumberOfIterations(15)
-        smoother.BoundarySmoothingOn()
-        
-        normals = vtk.vtkPolyDataNormals()
-        normals.SetInputConnection(smoother.GetOutputPort())
-        normals.ComputePointNormalsOn()
-        normals.ComputeCellNormalsOn()
+        # Filter feeding the mapper; None maps the reader output as-is
+        upstream = None
+        if self.smooth_on_load_checkbox.isChecked():
+            smoother = vtk.vtkSmoothPolyDataFilter()
+            smoother.SetInputData(polydata)
+            smoother.SetNumberOfIterations(15)
+            smoother.BoundarySmoothingOn()
+            upstream = smoother
+        
+        # Smoothing moves points, so normals are recomputed after it; an
+        # unsmoothed mesh keeps any normals its file already provides
+        if upstream is not None or polydata.GetPointData().GetNormals() is None:
+            normals = vtk.vtkPolyDataNormals()
+            if upstream is None:
+                normals.SetInputData(polydata)
+            else:
+                normals.SetInputConnection(upstream.GetOutputPort())
+            # Phong shading only reads point normals; no edge splitting keeps
+            # the vertex count (and VBO size) equal to the input mesh
+            normals.ComputePointNormalsOn()
+            normals.ComputeCellNormalsOff()
+            normals.SplittingOff()
+            normals.ConsistencyOn()
+            upstream = normals
         
         mapper = vtk.vtkPolyDataMapper()
-        mapper.SetInputConnection(normals.GetOutputPort())
+        if upstream is None:
+            mapper.SetInputData(polydata)
+        else:
+            mapper.SetInputConnection(upstream.GetOutputPort())
+            # Loaded meshes never change: run the filters once and let the
+            # mapper skip the per-render pipeline update checks
+            upstream.Update()
+        mapper.StaticOn()
         
         actor = vtk.vtkActor()
         actor.SetMapper(mapper)
@@ -1756,26 +2242,23 @@ class Brain3DVisualizationGUI(QMainWindow):
         prop.SetDiffuse(0.8)
         
         # --- NEW: Assign color and system based on name ---
-        def get_segment_info(segment_name):
-            name_lower = segment_name.lower().replace('_', ' ')
-            # Iterate through groups to find a keyword match
-            for group_name, info in self.color_groups.items():
-                for keyword in info['keywords']:
-                    if keyword in name_lower:
-                        return group_name, info['color']
-            # No match found, return default
-            return self.default_group, self.color_groups[self.default_group]['color']
-
-        system, color = get_segment_info(segment_name)
+        system = _match_segment_info(segment_name, self._group_regex,
+                                     self._regex_group_name, self._group_rank)
+        if system is None:
+            # No match found, use default
+            system = self.default_group
+        color = self.color_groups[system]['color']
         # --- END NEW ---
         
         self.segment_manager.add_segment(segment_name, actor, mapper, reader, system, color)
         self.renderer.AddActor(actor)
-        self.picker.AddPickList(actor)
+        if not defer_picker:
+            # Batch loads register every actor in one rebuild_picklist() instead
+            self.picker.AddPickList(actor)
         
         self.add_segment_to_tree(segment_name, system) # Use new tree function
         
-        self.vtk_widget.GetRenderWindow().Render()
+        self.request_render()
         self.statusBar().showMessage(f"Loaded: {segment_name}")
         return True
 
@@ -1783,21 +2266,14 @@ class Brain3DVisualizationGUI(QMainWindow):
         self.reset_all() # Clear everything first
         
         # --- NEW: Use color map ---
-        cortex_group, cortex_color = self.default_group, self.color_groups[self.default_group]['color']
-        for g, i in self.color_groups.items():
-            if 'hemisphere' in i['keywords']:
-                cortex_group, cortex_color = g, i['color']
-                break
-
-        brainstem_group, brainstem_color = self.default_group, self.color_groups[self.default_group]['color']
-        for g, i in self.color_groups.items():
-            if 'brainstem' in i['keywords']:
-                brainstem_group, brainstem_color = g, i['color']
-                break
+        default = (self.default_group, self.color_groups[self.default_group]['color'])
+        cortex_group, cortex_color = self._keyword_index.get('hemisphere', default)
+        brainstem_group, brainstem_color = self._keyword_index.get('brainstem', default)
 
         OPACITY = 1.0
 
-        # Left hemisphere
+        # Both hemispheres are the same ellipsoid, so tessellate it once and
+        # let the two actors share the source and mapper
         sphere1 = vtk.vtkParametricEllipsoid()
         sphere1.SetXRadius(45); sphere1.SetYRadius(50); sphere1.SetZRadius(40)
         source1 = vtk.vtkParametricFunctionSource()
@@ -1805,6 +2281,9 @@ class Brain3DVisualizationGUI(QMainWindow):
         source1.SetUResolution(100); source1.SetVResolution(100); source1.Update()
         mapper1 = vtk.vtkPolyDataMapper()
         mapper1.SetInputConnection(source1.GetOutputPort())
+        mapper1.StaticOn() # Demo geometry never changes after Update()
+        
+        # Left hemisphere
         actor1 = vtk.vtkActor()
         actor1.SetMapper(mapper1)
         actor1.GetProperty().SetOpacity(OPACITY)
@@ -1812,32 +2291,22 @@ class Brain3DVisualizationGUI(QMainWindow):
         
         self.segment_manager.add_segment("Left_Hemisphere", actor1, mapper1, source1, cortex_group, cortex_color)
         self.renderer.AddActor(actor1)
-        self.picker.AddPickList(actor1)
-        self.add_segment_to_tree("Left_Hemisphere", cortex_group)
         
         # Right hemisphere
-        sphere2 = vtk.vtkParametricEllipsoid()
-        sphere2.SetXRadius(45); sphere2.SetYRadius(50); sphere2.SetZRadius(40)
-        source2 = vtk.vtkParametricFunctionSource()
-        source2.SetParametricFunction(sphere2)
-        source2.SetUResolution(100); source2.SetVResolution(100); source2.Update()
-        mapper2 = vtk.vtkPolyDataMapper()
-        mapper2.SetInputConnection(source2.GetOutputPort())
         actor2 = vtk.vtkActor()
-        actor2.SetMapper(mapper2)
+        actor2.SetMapper(mapper1)
         actor2.GetProperty().SetOpacity(OPACITY)
         actor2.SetPosition(5, 0, 0)
         
-        self.segment_manager.add_segment("Right_Hemisphere", actor2, mapper2, source2, cortex_group, cortex_color)
+        self.segment_manager.add_segment("Right_Hemisphere", actor2, mapper1, source1, cortex_group, cortex_color)
         self.renderer.AddActor(actor2)
-        self.picker.AddPickList(actor2)
-        self.add_segment_to_tree("Right_Hemisphere", cortex_group)
         
         # Brainstem
         cylinder = vtk.vtkCylinderSource()
         cylinder.SetRadius(15); cylinder.SetHeight(35); cylinder.SetResolution(50); cylinder.Update()
         mapper3 = vtk.vtkPolyDataMapper()
         mapper3.SetInputConnection(cylinder.GetOutputPort())
+        mapper3.StaticOn()
         actor3 = vtk.vtkActor()
         actor3.SetMapper(mapper3)
         actor3.GetProperty().SetOpacity(OPACITY)
@@ -1846,24 +2315,26 @@ class Brain3DVisualizationGUI(QMainWindow):
         
         self.segment_manager.add_segment("Brainstem", actor3, mapper3, cylinder, brainstem_group, brainstem_color)
         self.renderer.AddActor(actor3)
-        self.picker.AddPickList(actor3)
-        self.add_segment_to_tree("Brainstem", brainstem_group)
+        
+        with self.bulk_tree_update():
+            self.add_segment_to_tree("Left_Hemisphere", cortex_group)
+            self.add_segment_to_tree("Right_Hemisphere", cortex_group)
+            self.add_segment_to_tree("Brainstem", brainstem_group)
         
         # --- MODIFIED: Update new sliders ---
-        self.master_opacity_slider.setValue(100)
-        for slider in self.group_opacity_sliders.values():
-            slider.setValue(100)
+        self.reset_opacity_sliders()
         # --- END MODIFIED ---
         
+        self.segment_manager.rebuild_picklist(self.picker)
         self.update_model_center()
         
         self.renderer.ResetCamera()
-        camera = self.renderer.GetActiveCamera()
+        camera = self._camera
         camera.Azimuth(30)
         camera.Elevation(20)
         camera.Dolly(1.2)
         
-        self.vtk_widget.GetRenderWindow().Render()
+        self._render_window.Render()
         
         self.data_status_label.setText("✓ Demo brain loaded")
         self.data_status_label.setStyleSheet(f"color: {self.colors['accent_green']};")
@@ -1884,55 +2355,57 @@ class Brain3DVisualizationGUI(QMainWindow):
         group_name = segment['system']
         if group_name in self.group_opacity_sliders:
             slider = self.group_opacity_sliders[group_name]
-            slider.blockSignals(True)
-            
-            # Check if all other sliders in this group match
-            all_match = True
-            for seg_name, seg in self.segment_manager.segments.items():
-                if seg['system'] == group_name:
-                    if int(seg['opacity'] * 100) != value:
-                        all_match = False
-                        break
-            
-            if all_match:
-                slider.setValue(value)
-            else:
-                # If they don't match, maybe set slider to a "mixed" state?
-                # For now, we'll just reflect the last changed item.
-                slider.setValue(value) # Simple update
+            with QSignalBlocker(slider):
+                # Check if all other sliders in this group match
+                all_match = self.segment_manager.group_opacity_uniform(group_name)
                 
-            slider.blockSignals(False)
+                if all_match:
+                    slider.setValue(value)
+                else:
+                    # If they don't match, maybe set slider to a "mixed" state?
+                    # For now, we'll just reflect the last changed item.
+                    slider.setValue(value) # Simple update
             
-        self.vtk_widget.GetRenderWindow().Render()
+        self.request_render()
         
     # --- NEW: `update_master_opacity` from Dental ---
     def update_master_opacity(self, value):
         opacity = value / 100.0
         self.master_opacity_label.setText(f"{value}%")
         
-        for name in self.segment_manager.segments.keys():
-            self.segment_manager.set_opacity(name, opacity)
+        self.segment_manager.set_all_opacity(opacity)
         
         # Update all other sliders to match
         for slider in self.group_opacity_sliders.values():
-            slider.blockSignals(True)
-            slider.setValue(value)
-            slider.blockSignals(False)
-        
-        # Update all sliders in the tree
-        for i in range(self.segment_tree.topLevelItemCount()):
-            root_item = self.segment_tree.topLevelItem(i)
-            for j in range(root_item.childCount()):
-                child_item = root_item.child(j)
-                widget = self.segment_tree.itemWidget(child_item, 1)
-                if widget:
-                    slider = widget.findChild(QSlider)
-                    if slider:
-                        slider.blockSignals(True)
-                        slider.setValue(value)
-                        slider.blockSignals(False)
+            with QSignalBlocker(slider):
+                slider.setValue(value)
+        
+        # Update all rows in the tree
+        for name in self._segment_tree_items:
+            self._sync_segment_opacity_row(name, value)
                         
-        self.vtk_widget.GetRenderWindow().Render()
+        self.segment_manager.rebuild_picklist(self.picker)
+        self.request_render()
+
+    def _sync_segment_opacity_row(self, segment_name, value):
+        """Show a new opacity on a segment's tree row. Rows in collapsed
+        groups have no slider yet, so their column text is updated instead."""
+        slider = self._segment_sliders.get(segment_name)
+        if slider:
+            with QSignalBlocker(slider):
+                slider.setValue(value)
+        else:
+            item = self._segment_tree_items.get(segment_name)
+            if item is not None:
+                item.setText(1, f"{value}%")
+
+    def reset_opacity_sliders(self):
+        """Put master, group and segment opacity back to 100% immediately.
+        The sliders are set with signals blocked so their debounced slots
+        don't fire after the caller has returned."""
+        with QSignalBlocker(self.master_opacity_slider):
+            self.master_opacity_slider.setValue(100)
+        self.update_master_opacity(100)
 
     # --- NEW: `update_group_opacity` for new sliders ---
     def update_group_opacity(self, group_name, value):
@@ -1940,30 +2413,14 @@ class Brain3DVisualizationGUI(QMainWindow):
         opacity = value / 100.0
         
         # Update all segments in this group
-        for name, segment in self.segment_manager.segments.items():
-            if segment['system'] == group_name:
-                self.segment_manager.set_opacity(name, opacity)
+        self.segment_manager.set_group_opacity(group_name, opacity)
                 
-        # Update all sliders in the tree for this group
-        root_item = None
-        for i in range(self.segment_tree.topLevelItemCount()):
-            temp_item = self.segment_tree.topLevelItem(i)
-            if temp_item.text(0) == group_name:
-                root_item = temp_item
-                break
-        
-        if root_item:
-            for i in range(root_item.childCount()):
-                child_item = root_item.child(i)
-                widget = self.segment_tree.itemWidget(child_item, 1)
-                if widget:
-                    slider = widget.findChild(QSlider)
-                    if slider:
-                        slider.blockSignals(True)
-                        slider.setValue(value)
-                        slider.blockSignals(False)
+        # Update all rows in the tree for this group
+        for name in self.segment_manager.segment_groups.get(group_name, ()):
+            self._sync_segment_opacity_row(name, value)
                         
-        self.vtk_widget.GetRenderWindow().Render()
+        self.segment_manager.rebuild_picklist(self.picker)
+        self.request_render()
         self.statusBar().showMessage(f"{group_name} group opacity set to {value}%")
 
     # --- REMOVED old opacity functions ---
@@ -1971,17 +2428,17 @@ class Brain3DVisualizationGUI(QMainWindow):
     def toggle_smooth_shading(self, state):
         for segment in self.segment_manager.segments.values():
             if state == Qt.Checked:
-                segment['actor'].GetProperty().SetInterpolationToPhong()
+                segment['property'].SetInterpolationToPhong()
             else:
-                segment['actor'].GetProperty().SetInterpolationToFlat()
+                segment['property'].SetInterpolationToFlat()
         
-        self.vtk_widget.GetRenderWindow().Render()
+        self._render_window.Render()
     
     def toggle_edges(self, state):
         for segment in self.segment_manager.segments.values():
-            segment['actor'].GetProperty().SetEdgeVisibility(state == Qt.Checked)
+            segment['property'].SetEdgeVisibility(state == Qt.Checked)
         
-        self.vtk_widget.GetRenderWindow().Render()
+        self._render_window.Render()
     
     # ==================== NEW: Clipping Methods ====================
     def open_clipping_dialog(self):
@@ -1996,16 +2453,9 @@ class Brain3DVisualizationGUI(QMainWindow):
             self.renderer.RemoveActor(actor)
         self.plane_actors.clear()
         
-        actors = self.segment_manager.get_all_actors()
-        if not actors:
+        bounds_array = self.segment_manager.get_bounds()
+        if bounds_array is None:
             bounds_array = [0, 1, 0, 1, 0, 1]
-        else:
-            prop_bounds = vtk.vtkBoundingBox()
-            for actor in actors:
-                prop_bounds.AddBounds(actor.GetBounds())
-            
-            bounds_array = [0.0] * 6
-            prop_bounds.GetBounds(bounds_array)
         
         xmin, xmax, ymin, ymax, zmin, zmax = bounds_array
         
@@ -2013,48 +2463,31 @@ class Brain3DVisualizationGUI(QMainWindow):
         y_pos = ymin + params['y_pos'] * (ymax - ymin)
         z_pos = zmin + params['z_pos'] * (zmax - zmin)
         
+        # One set of planes shared by every mapper; only origins change
+        if self._clip_planes is None:
+            self._clip_planes = {}
+            for key, normal in (('hide_left', (1, 0, 0)), ('hide_right', (-1, 0, 0)),
+                                ('hide_front', (0, 1, 0)), ('hide_back', (0, -1, 0)),
+                                ('hide_bottom', (0, 0, 1)), ('hide_top', (0, 0, -1))):
+                plane = vtk.vtkPlane()
+                plane.SetNormal(normal)
+                self._clip_planes[key] = plane
+            self._clip_plane_collection = vtk.vtkPlaneCollection()
+        
+        origins = {
+            'hide_left': (x_pos, 0, 0), 'hide_right': (x_pos, 0, 0),
+            'hide_front': (0, y_pos, 0), 'hide_back': (0, y_pos, 0),
+            'hide_bottom': (0, 0, z_pos), 'hide_top': (0, 0, z_pos),
+        }
+        planes = self._clip_plane_collection
+        planes.RemoveAllItems()
+        for key, plane in self._clip_planes.items():
+            if params[key]:
+                plane.SetOrigin(origins[key])
+                planes.AddItem(plane)
+        
         for seg in self.segment_manager.segments.values():
-            seg['mapper'].RemoveAllClippingPlanes()
-            planes = vtk.vtkPlaneCollection()
-            
-            if params['hide_left']:
-                p = vtk.vtkPlane()
-                p.SetOrigin(x_pos, 0, 0)
-                p.SetNormal(1, 0, 0)
-                planes.AddItem(p)
-            
-            if params['hide_right']:
-                p = vtk.vtkPlane()
-                p.SetOrigin(x_pos, 0, 0)
-                p.SetNormal(-1, 0, 0)
-                planes.AddItem(p)
-            
-            if params['hide_front']:
-                p = vtk.vtkPlane()
-                p.SetOrigin(0, y_pos, 0)
-                p.SetNormal(0, 1, 0)
-                planes.AddItem(p)
-            
-            if params['hide_back']:
-                p = vtk.vtkPlane()
-                p.SetOrigin(0, y_pos, 0)
-                p.SetNormal(0, -1, 0)
-                planes.AddItem(p)
-            
-            if params['hide_bottom']:
-                p = vtk.vtkPlane()
-                p.SetOrigin(0, 0, z_pos)
-                p.SetNormal(0, 0, 1)
-                planes.AddItem(p)
-            
-            if params['hide_top']:
-                p = vtk.vtkPlane()
-                p.SetOrigin(0, 0, z_pos)
-                p.SetNormal(0, 0, -1)
-                planes.AddItem(p)
-            
-            if planes.GetNumberOfItems() > 0:
-                seg['mapper'].SetClippingPlanes(planes)
+            seg['mapper'].SetClippingPlanes(planes)
         
         if params['show_axial']:
             plane = vtk.vtkPlaneSource()
@@ -2098,7 +2531,7 @@ class Brain3DVisualizationGUI(QMainWindow):
             self.renderer.AddActor(actor)
             self.plane_actors.append(actor)
         
-        self.vtk_widget.GetRenderWindow().Render()
+        self._render_window.Render()
 
     # ==================== NEW: MPR Methods ====================
     def open_mpr_dialog(self):
@@ -2120,24 +2553,25 @@ class Brain3DVisualizationGUI(QMainWindow):
         else:
             self.animation_timer.stop()
             self.statusBar().showMessage("Animation stopped")
+        self._update_background()
     
     def update_animation(self):
         speed = self.speed_slider.value() / 100.0
         self.animation_frame += 1
         
-        camera = self.renderer.GetActiveCamera()
+        camera = self._camera
         camera.Azimuth(speed)
         
-        self.vtk_widget.GetRenderWindow().Render()
+        self.request_render()
     
     def reset_animation(self):
         self.animation_frame = 0
         self.renderer.ResetCamera()
-        self.vtk_widget.GetRenderWindow().Render()
+        self._render_window.Render()
     
     def reset_camera(self):
         self.renderer.ResetCamera()
-        self.vtk_widget.GetRenderWindow().Render()
+        self._render_window.Render()
         self.statusBar().showMessage("Camera reset")
     
     def reset_all(self):
@@ -2166,6 +2600,9 @@ class Brain3DVisualizationGUI(QMainWindow):
             # Clear segment manager and tree
             self.segment_manager.clear()
             self.segment_tree.clear()
+            self._group_tree_items.clear()
+            self._segment_tree_items.clear()
+            self._segment_sliders.clear()
             
             self.play_btn.setChecked(False)
             self.flight_btn.setChecked(False)
@@ -2182,16 +2619,13 @@ class Brain3DVisualizationGUI(QMainWindow):
             self.neural_info_label.setText("Ready")
             
             # --- NEW: Reset all opacity sliders ---
-            self.master_opacity_slider.setValue(100)
-            for slider in self.group_opacity_sliders.values():
-                if slider: # Check if it exists
-                    slider.setValue(100)
+            self.reset_opacity_sliders()
             # --- END NEW ---
             
             self.model_center = [0, 0, 0]
             
             self.renderer.ResetCamera()
-            self.vtk_widget.GetRenderWindow().Render()
+            self._render_window.Render()
             self.statusBar().showMessage("Reset complete")
 
 